@@ -3,26 +3,62 @@
 from __future__ import annotations
 
 import contextlib
+import fcntl
+import functools
 import getpass
+import hashlib
+import json
+import mmap
 import os
+import re
 import shutil
 import socket
 import subprocess
 import tempfile
 import textwrap
+import time
 import uuid
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import Iterable, Iterator, Mapping, Sequence
+
+try:
+    import psycopg
+except ImportError:  # pragma: no cover - fall back to spawning psql
+    psycopg = None
+
+
+HELPERS_SQL = Path(__file__).parent / "sql" / "helpers.sql"
+PG_CTL_TIMEOUT = 120.0
+PG_CTL_POLL_INTERVAL = 0.05
 
 
 class ClusterEnvironmentError(RuntimeError):
     """Raised when the local environment cannot support a test cluster."""
 
 
-def _find_free_port() -> int:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind(("127.0.0.1", 0))
-        return sock.getsockname()[1]
+# Errors raised by run_sql() depending on whether psycopg or psql executes it.
+_SQL_ERRORS: tuple[type[Exception], ...] = (subprocess.CalledProcessError,)
+if psycopg is not None:
+    _SQL_ERRORS += (psycopg.Error,)
+
+
+def _reserve_ports(n: int) -> list[tuple[int, socket.socket]]:
+    """Bind ``n`` free loopback ports and keep the sockets open as reservations.
+
+    Callers close a socket right before handing its port to the postmaster, so
+    a concurrent worker cannot pick the same port in the meantime.
+    """
+    sockets: list[socket.socket] = []
+    try:
+        for _ in range(n):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sockets.append(sock)
+            sock.bind(("127.0.0.1", 0))
+    except BaseException:
+        for sock in sockets:
+            sock.close()
+        raise
+    return [(sock.getsockname()[1], sock) for sock in sockets]
 
 
 def _which_pg_config() -> str:
@@ -35,39 +71,109 @@ def _which_pg_config() -> str:
     return pg_config
 
 
+@functools.lru_cache(maxsize=None)
+def _pg_bindir(pg_config: str) -> Path:
+    return Path(subprocess.check_output([pg_config, "--bindir"], text=True).strip())
+
+
+@functools.lru_cache(maxsize=1)
+def _helper_sql_bytes() -> bytes:
+    return HELPERS_SQL.read_bytes()
+
+
+def _discard_tree(path: Path) -> None:
+    """Move ``path`` out of the way and delete it without waiting."""
+    if not path.exists():
+        return
+    doomed = path.with_name(f"{path.name}.deleting-{uuid.uuid4().hex}")
+    try:
+        # Same-directory rename is atomic, so ``path`` is free for reuse at once.
+        os.rename(path, doomed)
+        subprocess.Popen(
+            ["rm", "-rf", str(doomed)],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        shutil.rmtree(doomed if doomed.exists() else path, ignore_errors=True)
+
+
+def _read_tail(path: Path, tail_bytes: int | None, start: int = 0) -> str:
+    """Decode ``path`` from ``start`` (or its last ``tail_bytes``), beginning on a line boundary."""
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if tail_bytes is not None:
+            start = max(start, size - tail_bytes)
+        if start >= size:
+            return ""
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if start and mm[start - 1] != ord("\n"):
+                newline = mm.find(b"\n", start)
+                start = size if newline == -1 else newline + 1
+            return mm[start:].decode("utf-8", errors="replace")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_SHM_PERMISSION_RE = re.compile(
+    r"could not create shared memory segment.*?(?:operation not permitted|permission denied)",
+    re.IGNORECASE | re.DOTALL,
+)
+_SHM_EXHAUSTED_RE = re.compile(
+    r"could not create shared memory segment.*?no space left on device",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _output_matches(exc: subprocess.CalledProcessError, pattern: re.Pattern[str]) -> bool:
+    return any(pattern.search(bit) for bit in (exc.stderr, exc.stdout) if bit)
+
+
 def _is_shared_memory_permission_error(exc: subprocess.CalledProcessError) -> bool:
-    output_bits = [exc.stderr, exc.stdout]
-    text = "\n".join(bit for bit in output_bits if bit).lower()
-    needle = "could not create shared memory segment"
-    return needle in text and ("operation not permitted" in text or "permission denied" in text)
+    return _output_matches(exc, _SHM_PERMISSION_RE)
 
 
 def _is_shared_memory_resource_exhausted(exc: subprocess.CalledProcessError) -> bool:
-    output_bits = [exc.stderr, exc.stdout]
-    text = "\n".join(bit for bit in output_bits if bit).lower()
-    return "could not create shared memory segment" in text and "no space left on device" in text
+    return _output_matches(exc, _SHM_EXHAUSTED_RE)
 
 
 class PgTestCluster:
     """Manages one temporary PostgreSQL cluster for pytest."""
 
-    def __init__(self, base_dir: Path):
+    def __init__(
+        self,
+        base_dir: Path,
+        *,
+        socket_dir: Path | None = None,
+        database: str = "pg_retry_system_tests",
+        template_database: str = "pg_retry_system_tests_template",
+    ):
         self.base_dir = Path(base_dir)
         self.data_dir = self.base_dir / "data"
-        socket_suffix = f"{self.base_dir.name[:16]}_{uuid.uuid4().hex[:8]}"
-        self.socket_dir = Path(tempfile.gettempdir()) / f"pg_retry_{socket_suffix}"
+        if socket_dir is None:
+            socket_suffix = f"{self.base_dir.name[:16]}_{uuid.uuid4().hex[:8]}"
+            socket_dir = Path(tempfile.gettempdir()) / f"pg_retry_{socket_suffix}"
+        self.socket_dir = Path(socket_dir)
         self.logfile = self.base_dir / "postgres.log"
         self.host = "127.0.0.1"
         self.listen_addresses = "127.0.0.1"
         self.port = None
         self.cluster_started = False
-        self.database = "pg_retry_system_tests"
+        self.database = database
+        self.template_database = template_database
         self.user = os.getenv("PGUSER") or getpass.getuser()
 
         pg_config = _which_pg_config()
-        self.bindir = Path(
-            subprocess.check_output([pg_config, "--bindir"], text=True).strip()
-        )
+        self.bindir = _pg_bindir(pg_config)
         self.pg_ctl = self.bindir / "pg_ctl"
         self.initdb = self.bindir / "initdb"
         self.psql = self.bindir / "psql"
@@ -78,17 +184,28 @@ class PgTestCluster:
             pgbench_path = Path(cmd) if cmd else None
         self.pgbench = pgbench_path if pgbench_path and pgbench_path.exists() else None
         self.keep_cluster = bool(os.getenv("PG_RETRY_KEEP_CLUSTER"))
+        self._admin_conns: dict[str, psycopg.Connection] = {}
+        self._base_env: dict[str, str] = {}
+        self._base_env_key: tuple[str, int | None] | None = None
+        self._log_marks: dict[Path, int] = {}
 
     # ---------- lifecycle management ----------
     def start(self) -> None:
         if self.cluster_started:
             return
+        self.start_server()
+        self.create_template()
+        self.create_database()
 
+    def start_server(self) -> None:
+        """Run ``initdb`` and start the postmaster without creating the test database."""
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.socket_dir.mkdir(parents=True, exist_ok=True)
 
+        reserved: list[tuple[int, socket.socket]] = []
         try:
-            self.port = _find_free_port()
+            reserved = _reserve_ports(1)
+            self.port = reserved[0][0]
             self.host = "127.0.0.1"
             self.listen_addresses = "127.0.0.1"
         except PermissionError:
@@ -98,6 +215,18 @@ class PgTestCluster:
             self.host = str(self.socket_dir)
             self.listen_addresses = ""
 
+        try:
+            self._init_data_dir()
+            self._configure_postgresql_conf()
+        finally:
+            # Release the reservation as late as possible, just before the
+            # postmaster binds the port itself.
+            for _, sock in reserved:
+                sock.close()
+        self._run_pg_ctl("start")
+        self.cluster_started = True
+
+    def _init_data_dir(self) -> None:
         try:
             self._run(
                 [
@@ -125,32 +254,81 @@ class PgTestCluster:
                 ) from exc
             raise
 
-        self._configure_postgresql_conf()
-        self._run_pg_ctl("start")
+    def attach(self, *, port: int, host: str, listen_addresses: str) -> None:
+        """Point this object at a postmaster that another process already started."""
+        self.port = port
+        self.host = host
+        self.listen_addresses = listen_addresses
         self.cluster_started = True
 
+    def create_template(self) -> None:
+        """Build the template database that every test database is cloned from."""
+        template = self.template_database
+        self._run_sql(
+            f"CREATE DATABASE {template} TEMPLATE template0",
+            dbname="postgres",
+            check_exists=True,
+        )
+        self.run_sql("CREATE EXTENSION IF NOT EXISTS pg_retry", dbname=template)
+        self._load_helper_sql(dbname=template)
+        # CREATE DATABASE ... TEMPLATE refuses to copy a database with open sessions.
+        self._close_admin(template)
+        self._run_sql(
+            f"ALTER DATABASE {template} IS_TEMPLATE true ALLOW_CONNECTIONS false",
+            dbname="postgres",
+        )
+
+    def create_database(self) -> None:
+        """Clone this holder's test database from the template."""
+        # A database left behind by an earlier process with the same PID would
+        # otherwise be picked up as-is.
+        self.drop_database(self.database)
+        self.clone_database(self.database)
+
+    def clone_database(self, name: str) -> None:
+        """Create ``name`` as a copy of the template with pg_retry and the helpers loaded."""
         self._run_sql(
-            f"CREATE DATABASE {self.database}",
+            f"CREATE DATABASE {name} TEMPLATE {self.template_database}",
             dbname="postgres",
             check_exists=True,
         )
-        self.run_sql("CREATE EXTENSION IF NOT EXISTS pg_retry")
-        self._load_helper_sql()
+
+    def drop_database(self, name: str | None = None) -> None:
+        """Drop ``name``, or this holder's test database by default.
+
+        The template is shared by every holder and goes away with the cluster.
+        """
+        if not self.cluster_started:
+            return
+        if name is None:
+            if self.keep_cluster:
+                return
+            name = self.database
+        self._close_admin(name)
+        with contextlib.suppress(*_SQL_ERRORS):
+            self._run_sql(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)", dbname="postgres")
+
+    def postmaster_alive(self) -> bool:
+        pid_file = self.data_dir / "postmaster.pid"
+        try:
+            pid = int(pid_file.read_text(encoding="utf-8").splitlines()[0])
+        except (FileNotFoundError, IndexError, ValueError):
+            return False
+        return _pid_alive(pid)
 
     def stop(self) -> None:
         if not self.cluster_started:
             return
-        with contextlib.suppress(subprocess.CalledProcessError):
+        self._close_admin()
+        with contextlib.suppress(subprocess.CalledProcessError, TimeoutError):
             self._run_pg_ctl("stop", extra_args=("-m", "fast"))
         self.cluster_started = False
 
     def destroy(self) -> None:
         self.stop()
         if not self.keep_cluster:
-            if self.base_dir.exists():
-                shutil.rmtree(self.base_dir)
-            if self.socket_dir.exists():
-                shutil.rmtree(self.socket_dir)
+            _discard_tree(self.base_dir)
+            _discard_tree(self.socket_dir)
 
     # ---------- helpers ----------
     def _configure_postgresql_conf(self) -> None:
@@ -165,13 +343,19 @@ class PgTestCluster:
             log_directory = 'pg_log'
             log_min_messages = warning
             log_line_prefix = '%t [%p]: [%l-1] user=%u,db=%d,app=%a,client=%h '
-            log_statement = 'all'
+            log_statement = 'none'
             session_preload_libraries = 'pg_retry'
             fsync = off
             synchronous_commit = off
             full_page_writes = off
+            wal_level = minimal
+            max_wal_senders = 0
+            checkpoint_timeout = 1h
+            max_wal_size = 2GB
+            autovacuum = off
+            bgwriter_lru_maxpages = 0
             shared_buffers = '128MB'
-            max_connections = 50
+            max_connections = 200
             statement_timeout = 0
             lock_timeout = 0
             """
@@ -180,10 +364,53 @@ class PgTestCluster:
             fh.write("\n" + settings + "\n")
 
     def _run_pg_ctl(self, action: str, extra_args: Sequence[str] | None = None) -> None:
-        args = [str(self.pg_ctl), "-D", str(self.data_dir), "-l", str(self.logfile), "-w", "-t", "120", action]
+        # pg_ctl -w sleeps up to a second between readiness checks on older
+        # releases; run it with -W and poll postmaster.pid at a finer interval.
+        args = [str(self.pg_ctl), "-D", str(self.data_dir), "-l", str(self.logfile), "-W", action]
         if extra_args:
             args.extend(extra_args)
         self._run(args, capture_output=True)
+        if action == "start":
+            self._wait_for_start()
+        elif action == "stop":
+            pid_file = self.data_dir / "postmaster.pid"
+            self._wait_until(lambda: not pid_file.exists(), "postmaster did not shut down")
+
+    def _wait_for_start(self, timeout: float = PG_CTL_TIMEOUT, pid_file_grace: float = 5.0) -> None:
+        """Poll postmaster.pid until the server is ready, failing fast if it dies."""
+        pid_file = self.data_dir / "postmaster.pid"
+        started = time.monotonic()
+        while True:
+            try:
+                lines = pid_file.read_text(encoding="utf-8").splitlines()
+            except FileNotFoundError:
+                lines = []
+            # The eighth line carries the postmaster status, the same field
+            # pg_ctl -w inspects.
+            if len(lines) >= 8 and lines[7].strip() == "ready":
+                return
+            elapsed = time.monotonic() - started
+            if lines and lines[0].strip().isdigit() and not _pid_alive(int(lines[0])):
+                raise RuntimeError(f"postmaster exited during startup\n{self._logfile_tail()}")
+            if not lines and elapsed >= pid_file_grace:
+                raise RuntimeError(f"postmaster.pid did not appear within {pid_file_grace}s\n{self._logfile_tail()}")
+            if elapsed >= timeout:
+                raise TimeoutError(f"postmaster did not become ready\n{self._logfile_tail()}")
+            time.sleep(PG_CTL_POLL_INTERVAL)
+
+    def _logfile_tail(self, tail_bytes: int = 4096) -> str:
+        try:
+            return f"last lines of {self.logfile}:\n{_read_tail(self.logfile, tail_bytes)}"
+        except FileNotFoundError:
+            return f"{self.logfile} was not written"
+
+    @staticmethod
+    def _wait_until(predicate, message: str, timeout: float = PG_CTL_TIMEOUT) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(message)
+            time.sleep(PG_CTL_POLL_INTERVAL)
 
     def _run(
         self,
@@ -192,17 +419,44 @@ class PgTestCluster:
         env: Mapping[str, str] | None = None,
         capture_output: bool = False,
     ) -> subprocess.CompletedProcess[str]:
-        result = subprocess.run(
-            args,
-            check=True,
-            env=env,
-            text=True,
-            capture_output=capture_output,
-        )
+        """Run ``args``, raising CalledProcessError on a non-zero exit.
+
+        With ``capture_output`` the child writes straight into temporary files
+        instead of pipes; they are only read back (onto the exception) when the
+        command fails, so successful runs return no captured output.
+        """
+        if not capture_output:
+            return subprocess.run(args, check=True, env=env, text=True)
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            result = subprocess.run(args, env=env, stdout=out, stderr=err)
+            if result.returncode != 0:
+                out.seek(0)
+                err.seek(0)
+                raise subprocess.CalledProcessError(
+                    result.returncode,
+                    args,
+                    output=out.read().decode("utf-8", errors="replace"),
+                    stderr=err.read().decode("utf-8", errors="replace"),
+                )
         return result
 
-    def _run_sql(self, sql: str, dbname: str | None = None, check_exists: bool = False) -> None:
+    def _admin(self, dbname: str | None = None) -> "psycopg.Connection":
+        """Return a cached autocommit connection to ``dbname``."""
         db = dbname or self.database
+        conn = self._admin_conns.get(db)
+        if conn is None or conn.closed:
+            conn = psycopg.connect(self.dsn(dbname=db), autocommit=True)
+            self._admin_conns[db] = conn
+        return conn
+
+    def _close_admin(self, dbname: str | None = None) -> None:
+        dbs = [dbname] if dbname else list(self._admin_conns)
+        for db in dbs:
+            conn = self._admin_conns.pop(db, None)
+            if conn is not None:
+                conn.close()
+
+    def _psql(self, db: str, *args: str, capture_output: bool = False) -> None:
         cmd = [
             str(self.psql),
             "-h",
@@ -213,38 +467,34 @@ class PgTestCluster:
             db,
             "-v",
             "ON_ERROR_STOP=1",
-            "-c",
-            sql,
+            *args,
         ]
+        self._run(cmd, env=self.client_env(dbname=db), capture_output=capture_output)
+
+    def _run_sql(self, sql: str, dbname: str | None = None, check_exists: bool = False) -> None:
+        db = dbname or self.database
+        if psycopg is None:
+            try:
+                self._psql(db, "-c", sql, capture_output=check_exists)
+            except subprocess.CalledProcessError as exc:
+                if check_exists and exc.stderr and "already exists" in exc.stderr:
+                    return
+                raise
+            return
         try:
-            self._run(
-                cmd,
-                env=self.client_env(dbname=db),
-                capture_output=check_exists,
-            )
-        except subprocess.CalledProcessError as exc:
-            if check_exists and exc.stderr and "already exists" in exc.stderr:
-                return
-            raise
+            self._admin(db).execute(sql)
+        except psycopg.errors.DuplicateDatabase:
+            if not check_exists:
+                raise
 
-    def _load_helper_sql(self) -> None:
-        helpers = Path(__file__).parent / "sql" / "helpers.sql"
-        if not helpers.exists():
+    def _load_helper_sql(self, dbname: str | None = None) -> None:
+        if not HELPERS_SQL.exists():
             raise RuntimeError("missing helper SQL: system_tests/sql/helpers.sql")
-        cmd = [
-            str(self.psql),
-            "-h",
-            self.host,
-            "-p",
-            str(self.port),
-            "-d",
-            self.database,
-            "-v",
-            "ON_ERROR_STOP=1",
-            "-f",
-            str(helpers),
-        ]
-        self._run(cmd, env=self.client_env())
+        if psycopg is None:
+            self.run_sql_file(HELPERS_SQL, dbname=dbname)
+            return
+        # The whole script goes out as a single simple-protocol Query message.
+        self._admin(dbname).execute(_helper_sql_bytes())
 
     # ---------- convenience API ----------
     def run_sql(self, sql: str, dbname: str | None = None) -> None:
@@ -252,56 +502,127 @@ class PgTestCluster:
 
     def run_sql_file(self, path: Path, dbname: str | None = None) -> None:
         db = dbname or self.database
-        cmd = [
-            str(self.psql),
-            "-h",
-            self.host,
-            "-p",
-            str(self.port),
-            "-d",
-            db,
-            "-v",
-            "ON_ERROR_STOP=1",
-            "-f",
-            str(path),
-        ]
-        self._run(cmd, env=self.client_env(dbname=db))
+        if psycopg is None:
+            self._psql(db, "-f", str(path))
+            return
+        # Without parameters psycopg uses the simple query protocol, which
+        # accepts a whole semicolon-separated script in one call.
+        self._admin(db).execute(Path(path).read_text(encoding="utf-8"))
 
     def client_env(self, *, dbname: str | None = None) -> dict[str, str]:
-        env = os.environ.copy()
-        env.update(
-            {
+        # Copy os.environ once per host/port pair rather than on every spawn;
+        # start_server() and attach() change the connection target.
+        key = (self.host, self.port)
+        if self._base_env_key != key:
+            self._base_env = {
+                **os.environ,
                 "PGHOST": self.host,
                 "PGPORT": str(self.port),
-                "PGDATABASE": dbname or self.database,
                 "PGUSER": self.user,
             }
-        )
-        return env
+            self._base_env_key = key
+        return {**self._base_env, "PGDATABASE": dbname or self.database}
 
     def dsn(self, *, dbname: str | None = None) -> str:
         db = dbname or self.database
         return f"host={self.host} port={self.port} dbname={db} user={self.user}"
 
     # ---------- utilities for tests ----------
-    def truncate_log(self) -> None:
-        if self.logfile.exists():
-            self.logfile.write_text("", encoding="utf-8")
-        log_dir = self.data_dir / "pg_log"
-        if log_dir.exists():
-            for path in log_dir.glob("postgresql-*.log"):
-                path.unlink()
-
-    def read_log(self) -> str:
+    def enable_statement_logging(self) -> None:
+        """Log every statement in this holder's database until disable_statement_logging().
+
+        This is a per-database default, so it leaves other holders of the
+        shared cluster alone and applies to sessions opened from now on.
+        """
+        self.run_sql(f"ALTER DATABASE {self.database} SET log_statement = 'all'", dbname="postgres")
+
+    def disable_statement_logging(self) -> None:
+        self.run_sql(f"ALTER DATABASE {self.database} RESET log_statement", dbname="postgres")
+
+    def _log_paths(self, suffixes: tuple[str, ...] = (".log",)) -> list[Path]:
+        paths = [self.logfile]
+        with contextlib.suppress(FileNotFoundError), os.scandir(self.data_dir / "pg_log") as it:
+            paths.extend(
+                sorted(
+                    Path(entry.path)
+                    for entry in it
+                    if entry.name.startswith("postgresql-") and entry.name.endswith(suffixes)
+                )
+            )
+        return paths
+
+    def mark_log(self) -> None:
+        """Make the log readers below ignore everything logged so far.
+
+        The server logs are shared with every pytest process attached to the
+        cluster, so instead of truncating them this only records where each
+        file currently ends.
+        """
+        marks: dict[Path, int] = {}
+        for path in self._log_paths((".log", ".csv")):
+            with contextlib.suppress(FileNotFoundError):
+                marks[path] = path.stat().st_size
+        self._log_marks = marks
+
+    def read_log(self, tail_bytes: int | None = 64 * 1024) -> str:
+        """Return the server logs since mark_log(), keeping only the last ``tail_bytes`` of each file.
+
+        Pass ``tail_bytes=None`` to read everything since the mark. This is the
+        raw log, including output from other holders of the shared cluster.
+        """
         chunks: list[str] = []
-        if self.logfile.exists():
-            chunks.append(self.logfile.read_text(encoding="utf-8"))
-        log_dir = self.data_dir / "pg_log"
-        if log_dir.exists():
-            for path in sorted(log_dir.glob("postgresql-*.log")):
-                chunks.append(path.read_text(encoding="utf-8"))
+        for path in self._log_paths():
+            with contextlib.suppress(FileNotFoundError):
+                chunks.append(_read_tail(path, tail_bytes, self._log_marks.get(path, 0)))
         return "".join(chunks)
 
+    def _log_maps(self) -> Iterator[tuple[mmap.mmap, int]]:
+        """Yield a read-only mmap of each server log file with new content, and where that content starts."""
+        for path in self._log_paths():
+            try:
+                fh = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with fh:
+                start = self._log_marks.get(path, 0)
+                if os.fstat(fh.fileno()).st_size <= start:
+                    continue
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield mm, start
+
+    def _own_log_lines(self) -> Iterator[bytes]:
+        """Yield the lines logged since mark_log() by sessions on this holder's database.
+
+        Other holders write to the same files; ``log_line_prefix`` tags every
+        line with ``db=<name>,``, which is what tells them apart.
+        """
+        tag = f"db={self.database},".encode("utf-8")
+        for mm, start in self._log_maps():
+            pos = mm.find(tag, start)
+            while pos != -1:
+                line_start = mm.rfind(b"\n", start, pos) + 1 or start
+                line_end = mm.find(b"\n", pos)
+                if line_end == -1:
+                    line_end = len(mm)
+                yield mm[line_start:line_end]
+                pos = mm.find(tag, line_end)
+
+    def log_contains(self, needles: Iterable[bytes]) -> set[bytes]:
+        """Return the subset of ``needles`` this holder's sessions logged since mark_log()."""
+        pending = set(needles)
+        found: set[bytes] = set()
+        for line in self._own_log_lines():
+            if not pending:
+                break
+            hits = {needle for needle in pending if needle in line}
+            found |= hits
+            pending -= hits
+        return found
+
+    def log_search(self, pattern: re.Pattern[bytes]) -> bool:
+        """Return True if ``pattern`` matches a line this holder's sessions logged since mark_log()."""
+        return any(pattern.search(line) for line in self._own_log_lines())
+
     def pgbench_available(self) -> bool:
         return self.pgbench is not None
 
@@ -313,6 +634,7 @@ class PgTestCluster:
         threads: int = 2,
         duration: int = 5,
         extra_args: Iterable[str] | None = None,
+        stdout_sink: int = subprocess.PIPE,
     ) -> subprocess.Popen[str]:
         if not self.pgbench:
             raise RuntimeError("pgbench binary not found")
@@ -337,7 +659,7 @@ class PgTestCluster:
             cmd.extend(extra_args)
         return subprocess.Popen(
             cmd,
-            stdout=subprocess.PIPE,
+            stdout=stdout_sink,
             stderr=subprocess.PIPE,
             text=True,
             env=self.client_env(),
@@ -352,12 +674,143 @@ class PgTestCluster:
         return completed
 
 
-def build_cluster(tmp_path_factory) -> PgTestCluster:
-    base = Path(tmp_path_factory.mktemp("pg_retry_cluster"))
-    cluster = PgTestCluster(base)
-    try:
-        cluster.start()
-    except ClusterEnvironmentError:
-        cluster.destroy()
-        raise
-    return cluster
+class SharedClusterManager:
+    """Shares one running cluster between concurrent pytest processes.
+
+    The first holder runs ``initdb``/``pg_ctl start`` under a well-known base
+    directory; later holders (e.g. ``pytest-xdist`` workers) wait on
+    ``<base>/.lock`` and attach to the running postmaster. Each holder gets its
+    own database, and the cluster is torn down when the last holder releases it.
+    The template database is built once, by the holder that starts the server.
+    Holders are tracked by PID so that one killed without releasing is pruned
+    (and its database dropped) by the next process to take the lock.
+    """
+
+    def __init__(self, base_dir: Path | None = None):
+        if base_dir is None:
+            root = os.getenv("PG_RETRY_SHARED_DIR") or Path(tempfile.gettempdir()) / "pg_retry_shared"
+            # One cluster per PostgreSQL installation, so concurrent runs
+            # against different major versions never attach to each other.
+            bindir = str(_pg_bindir(_which_pg_config()))
+            base_dir = Path(root) / hashlib.sha1(bindir.encode("utf-8")).hexdigest()[:12]
+        self.base_dir = Path(base_dir)
+        self.lock_path = self.base_dir / ".lock"
+        self.holders_path = self.base_dir / ".holders"
+        self.state_path = self.base_dir / "cluster.json"
+        self.cluster: PgTestCluster | None = None
+
+    @staticmethod
+    def _database_name(pid: int) -> str:
+        return f"pg_retry_system_tests_{pid}"
+
+    def acquire(self) -> PgTestCluster:
+        if self.cluster is not None:
+            return self.cluster
+        pid = os.getpid()
+        cluster = PgTestCluster(
+            self.base_dir / "cluster",
+            socket_dir=self.base_dir / "socket",
+            database=self._database_name(pid),
+        )
+        with self._locked():
+            holders, dead = self._read_holders()
+            state = self._read_state()
+            started_server = False
+            if state and holders and cluster.postmaster_alive():
+                cluster.attach(**state)
+                for stale in dead:
+                    cluster.drop_database(self._database_name(stale))
+            else:
+                # Nothing is running, or every holder died without releasing
+                # the cluster: start over. Any holders still recorded point
+                # at a server that is gone, so they are dropped from the list;
+                # release() leaves the new cluster alone for them.
+                holders = []
+                started_server = True
+                if cluster.postmaster_alive():
+                    with contextlib.suppress(subprocess.CalledProcessError, TimeoutError):
+                        cluster._run_pg_ctl("stop", extra_args=("-m", "immediate"))
+                if cluster.base_dir.exists():
+                    shutil.rmtree(cluster.base_dir)
+                try:
+                    cluster.start_server()
+                except ClusterEnvironmentError:
+                    cluster.destroy()
+                    raise
+                self._write_state(cluster)
+            try:
+                if started_server:
+                    # This process started the server, so the template is ours to build.
+                    cluster.create_template()
+                cluster.create_database()
+            except Exception:
+                if started_server:
+                    cluster.destroy()
+                    self.state_path.unlink(missing_ok=True)
+                raise
+            self._write_holders([*(p for p in holders if p != pid), pid])
+        self.cluster = cluster
+        return cluster
+
+    def release(self) -> None:
+        cluster = self.cluster
+        if cluster is None:
+            return
+        with self._locked():
+            holders, _ = self._read_holders()
+            if os.getpid() not in holders:
+                # Dropped as stale when another process restarted the server;
+                # the cluster running now is not ours to tear down.
+                self.cluster = None
+                return
+            holders = [pid for pid in holders if pid != os.getpid()]
+            self._write_holders(holders)
+            if not holders:
+                cluster.destroy()
+                self.state_path.unlink(missing_ok=True)
+            else:
+                cluster.drop_database()
+        self.cluster = None
+
+    @contextlib.contextmanager
+    def _locked(self):
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _read_holders(self) -> tuple[list[int], list[int]]:
+        """Return the ``(live, dead)`` PIDs recorded as holding the cluster."""
+        try:
+            tokens = self.holders_path.read_text(encoding="utf-8").split()
+        except FileNotFoundError:
+            return [], []
+        live: list[int] = []
+        dead: list[int] = []
+        for token in tokens:
+            with contextlib.suppress(ValueError):
+                pid = int(token)
+                (live if _pid_alive(pid) else dead).append(pid)
+        return live, dead
+
+    def _write_holders(self, pids: Iterable[int]) -> None:
+        self.holders_path.write_text("".join(f"{pid}\n" for pid in pids), encoding="utf-8")
+
+    def _read_state(self) -> dict | None:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            return {key: state[key] for key in ("port", "host", "listen_addresses")}
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+
+    def _write_state(self, cluster: PgTestCluster) -> None:
+        state = {
+            "port": cluster.port,
+            "host": cluster.host,
+            "listen_addresses": cluster.listen_addresses,
+            "postmaster_pid": str(cluster.data_dir / "postmaster.pid"),
+        }
+        self.state_path.write_text(json.dumps(state), encoding="utf-8")
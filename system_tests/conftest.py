@@ -1,7 +1,11 @@
+import shutil
+import subprocess
+
 import psycopg
 import pytest
+from psycopg_pool import ConnectionPool
 
-from .cluster import ClusterEnvironmentError, PgTestCluster, build_cluster
+from .cluster import ClusterEnvironmentError, PgTestCluster, SharedClusterManager
 
 
 def pytest_addoption(parser):
@@ -54,6 +58,10 @@ def pytest_configure(config):
         "markers",
         "pgtap: marks tests that run pgTAP SQL-level test suites",
     )
+    config.addinivalue_line(
+        "markers",
+        "validation: marks file-system-only tests that never need the test cluster",
+    )
 
 
 def pytest_collection_modifyitems(config, items):
@@ -72,13 +80,59 @@ def pytest_collection_modifyitems(config, items):
 
 
 @pytest.fixture(scope="session")
-def pg_cluster(tmp_path_factory) -> PgTestCluster:
+def pg_cluster() -> PgTestCluster:
+    # One postmaster is shared by every pytest process (e.g. xdist workers);
+    # each session gets its own database inside it.
+    manager = SharedClusterManager()
     try:
-        cluster = build_cluster(tmp_path_factory)
+        cluster = manager.acquire()
     except ClusterEnvironmentError as exc:
         pytest.skip(str(exc))
     yield cluster
-    cluster.destroy()
+    manager.release()
+
+
+@pytest.fixture(scope="session")
+def pgreplay_bin() -> str:
+    path = shutil.which("pgreplay")
+    if not path:
+        pytest.skip("pgreplay binary not found in PATH - skipping pgreplay test")
+    return path
+
+
+@pytest.fixture(scope="session")
+def pgreplay_version(pgreplay_bin: str) -> str:
+    completed = subprocess.run(
+        [pgreplay_bin, "-v"],
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    assert completed.returncode == 0, f"pgreplay version check failed: {completed.stderr}"
+    return completed.stdout
+
+
+@pytest.fixture(scope="session")
+def pgbench_bin(pg_cluster: PgTestCluster) -> str:
+    if not pg_cluster.pgbench_available():
+        pytest.skip("pgbench binary not found in PATH or pg_config --bindir")
+    return str(pg_cluster.pgbench)
+
+
+@pytest.fixture(scope="session")
+def pgtap_available(pg_cluster: PgTestCluster) -> bool:
+    """Ensure pgTAP can be created in the target cluster or skip gracefully."""
+    with psycopg.connect(pg_cluster.dsn(), autocommit=True) as conn:
+        try:
+            conn.execute("CREATE EXTENSION IF NOT EXISTS pgtap")
+            conn.execute("SELECT plan(1)")
+            conn.execute("SELECT pass('pgTAP is working')")
+            conn.execute("SELECT * FROM finish()")
+        except psycopg.errors.UndefinedFile as exc:
+            pytest.skip(f"pgTAP extension is not installed in this environment: {exc}")
+        except psycopg.Error as exc:
+            pytest.fail(f"pgTAP setup failed for an unexpected reason: {exc}")
+    return True
 
 
 @pytest.fixture(scope="session")
@@ -86,14 +140,61 @@ def dsn(pg_cluster: PgTestCluster) -> str:
     return pg_cluster.dsn()
 
 
+@pytest.fixture(scope="session")
+def retry_template_db(pg_cluster: PgTestCluster) -> str:
+    # Template with pg_retry and the helper SQL installed; clone it with
+    # CREATE DATABASE ... TEMPLATE instead of re-running that setup.
+    return pg_cluster.template_database
+
+
+# Everything DISCARD ALL does except DEALLOCATE ALL: psycopg keeps a
+# client-side list of the statements it has prepared on a connection and would
+# go on binding them after the server had forgotten them.
+_SESSION_RESET_SQL = (
+    "CLOSE ALL; SET SESSION AUTHORIZATION DEFAULT; RESET ALL; UNLISTEN *; "
+    "SELECT pg_advisory_unlock_all(); DISCARD PLANS; DISCARD TEMP; DISCARD SEQUENCES"
+)
+
+
+def _reset_pooled_connection(connection: psycopg.Connection) -> None:
+    # Tests may flip autocommit or leave session GUCs behind; hand the next
+    # borrower a clean session.
+    connection.autocommit = True
+    connection.execute(_SESSION_RESET_SQL)
+
+
+@pytest.fixture(scope="session")
+def pool(dsn: str):
+    with ConnectionPool(
+        dsn,
+        min_size=2,
+        max_size=8,
+        kwargs={"autocommit": True},
+        reset=_reset_pooled_connection,
+    ) as connection_pool:
+        yield connection_pool
+
+
 @pytest.fixture
-def conn(dsn: str):
-    with psycopg.connect(dsn, autocommit=True) as connection:
+def conn(pool: ConnectionPool):
+    with pool.connection() as connection:
         yield connection
 
 
+@pytest.fixture
+def log_statement_enabled(pg_cluster: PgTestCluster):
+    # The cluster runs with log_statement = 'none'; tests that inspect the
+    # server log opt back in for their duration.
+    pg_cluster.enable_statement_logging()
+    yield
+    pg_cluster.disable_statement_logging()
+
+
 @pytest.fixture(autouse=True)
-def reset_helpers(conn):
-    with conn.cursor() as cur:
-        cur.execute("SELECT retry.reset_accounts()")
-        cur.execute("SELECT retry.reset_failure_plans()")
+def reset_helpers(request):
+    # Validation tests only read repository files; don't start a cluster for them.
+    if request.node.get_closest_marker("validation"):
+        return
+    conn = request.getfixturevalue("conn")
+    # One round-trip per test
+    conn.execute("SELECT retry.reset_accounts(), retry.reset_failure_plans()")
@@ -4,38 +4,67 @@ Basic validation tests for pg_retry extension that don't require database connec
 These tests validate the extension structure, files, and basic functionality.
 """
 
+import functools
 import os
 import json
 import re
 import sys
 from pathlib import Path
 
+import pytest
+
+pytestmark = pytest.mark.validation
+
+# Determine once whether we're running from the system_tests directory or root
+_BASE = Path('..') if (Path('..') / 'pg_retry.control').exists() else Path('.')
+
+# Directories whose entries the validation tests look up
+_TREE_DIRS = ('', 'extension_sql', 'src', 'test/sql', 'test/expected')
+
+
+@functools.lru_cache(maxsize=1)
+def _repo_tree(base: Path) -> frozenset:
+    """Relative paths of every entry in the directories listed in _TREE_DIRS."""
+    entries = set()
+    for rel in _TREE_DIRS:
+        try:
+            with os.scandir(base / rel) as it:
+                entries.update(os.path.join(rel, entry.name) for entry in it)
+        except FileNotFoundError:
+            continue
+    return frozenset(entries)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_bytes(path: Path) -> bytes:
+    """Raw contents of a repository file, read once per session."""
+    return path.read_bytes()
+
+
+_VERSION_RE = re.compile(rb'default_version\s*=\s*[\'"]?([^\'"\s]+)')
+_MAKEFILE_VARS = ['EXTENSION', 'EXTVERSION', 'MODULES', 'DATA']
+# Look for variable assignment with flexible whitespace
+_MAKEFILE_VAR_RES = {
+    var: re.compile(rb'^' + var.encode() + rb'\s*[:+]?=', re.MULTILINE)
+    for var in _MAKEFILE_VARS
+}
+
 
 def test_extension_files_exist():
     """Test that all required extension files exist."""
-    # Determine if we're running from system_tests directory or root
-    if os.path.exists('../extension_sql/pg_retry.sql'):
-        # Running from system_tests directory
-        base_path = '..'
-    else:
-        # Running from root directory
-        base_path = '.'
-
     required_files = [
-        f'{base_path}/extension_sql/pg_retry.sql',
-        f'{base_path}/extension_sql/pg_retry--1.0.0.sql',
-        f'{base_path}/src/pg_retry.c',
-        f'{base_path}/pg_retry.control',
-        f'{base_path}/META.json',
-        f'{base_path}/Makefile',
-        f'{base_path}/README.md',
-        f'{base_path}/LICENSE'
+        'extension_sql/pg_retry.sql',
+        'extension_sql/pg_retry--1.0.0.sql',
+        'src/pg_retry.c',
+        'pg_retry.control',
+        'META.json',
+        'Makefile',
+        'README.md',
+        'LICENSE'
     ]
 
-    missing_files = []
-    for file_path in required_files:
-        if not os.path.exists(file_path):
-            missing_files.append(file_path)
+    tree = _repo_tree(_BASE)
+    missing_files = [path for path in required_files if path not in tree]
 
     assert len(missing_files) == 0, f"Missing required files: {missing_files}"
     print("✅ All required extension files exist")
@@ -43,18 +72,16 @@ def test_extension_files_exist():
 
 def test_control_file():
     """Test that the control file has required fields."""
-    base_path = '..' if os.path.exists('../pg_retry.control') else '.'
-    with open(f'{base_path}/pg_retry.control', 'r') as f:
-        content = f.read()
+    content = _read_bytes(_BASE / 'pg_retry.control')
 
-    required_fields = ['comment', 'default_version', 'module_pathname']
+    required_fields = [b'comment', b'default_version', b'module_pathname']
     for field in required_fields:
-        assert field in content, f"Control file missing required field: {field}"
+        assert field in content, f"Control file missing required field: {field.decode()}"
 
     # Check version format
-    version_match = re.search(r'default_version\s*=\s*[\'"]?([^\'"\s]+)', content)
+    version_match = _VERSION_RE.search(content)
     assert version_match, "Could not find version in control file"
-    version = version_match.group(1)
+    version = version_match.group(1).decode()
     assert version == '1.0.0', f"Control file version should be 1.0.0, got {version}"
 
     print("✅ Control file validation passed")
@@ -62,9 +89,7 @@ def test_control_file():
 
 def test_meta_json():
     """Test that META.json has required structure."""
-    base_path = '..' if os.path.exists('../META.json') else '.'
-    with open(f'{base_path}/META.json', 'r') as f:
-        meta = json.load(f)
+    meta = json.loads(_read_bytes(_BASE / 'META.json'))
 
     required_keys = ['name', 'version', 'abstract', 'maintainer', 'license']
     for key in required_keys:
@@ -88,90 +113,81 @@ def test_meta_json():
 
 def test_extension_sql():
     """Test that the extension SQL file has correct structure."""
-    base_path = '..' if os.path.exists('../extension_sql/pg_retry.sql') else '.'
-    with open(f'{base_path}/extension_sql/pg_retry.sql', 'r') as f:
-        content = f.read()
+    content = _read_bytes(_BASE / 'extension_sql' / 'pg_retry.sql')
 
     # Check for schema creation
-    assert 'CREATE SCHEMA retry' in content, "Extension SQL missing schema creation"
+    assert b'CREATE SCHEMA retry' in content, "Extension SQL missing schema creation"
 
     # Check for function creation
-    assert 'CREATE OR REPLACE FUNCTION retry.retry' in content, "Extension SQL missing function creation"
+    assert b'CREATE OR REPLACE FUNCTION retry.retry' in content, "Extension SQL missing function creation"
 
     # Check for library reference
-    assert '$libdir/pg_retry' in content, "Extension SQL missing library reference"
+    assert b'$libdir/pg_retry' in content, "Extension SQL missing library reference"
 
     # Check for grants
-    assert 'GRANT USAGE ON SCHEMA retry TO PUBLIC' in content, "Extension SQL missing schema grants"
+    assert b'GRANT USAGE ON SCHEMA retry TO PUBLIC' in content, "Extension SQL missing schema grants"
 
     print("✅ Extension SQL validation passed")
 
 
 def test_c_source():
     """Test that the C source file has required components."""
-    base_path = '..' if os.path.exists('../src/pg_retry.c') else '.'
-    with open(f'{base_path}/src/pg_retry.c', 'r') as f:
-        content = f.read()
+    content = _read_bytes(_BASE / 'src' / 'pg_retry.c')
 
     # Check for required includes
     required_includes = ['postgres.h', 'fmgr.h']
     for include in required_includes:
-        assert f'#include "{include}"' in content, f"C source missing required include: {include}"
+        assert f'#include "{include}"'.encode() in content, f"C source missing required include: {include}"
 
     # Check for module magic
-    assert 'PG_MODULE_MAGIC' in content, "C source missing PG_MODULE_MAGIC"
+    assert b'PG_MODULE_MAGIC' in content, "C source missing PG_MODULE_MAGIC"
 
     # Check for function declarations
-    assert 'PG_FUNCTION_INFO_V1(pg_retry_retry)' in content, "C source missing function info"
+    assert b'PG_FUNCTION_INFO_V1(pg_retry_retry)' in content, "C source missing function info"
 
     # Check for init function
-    assert 'void _PG_init(void)' in content, "C source missing _PG_init function"
+    assert b'void _PG_init(void)' in content, "C source missing _PG_init function"
 
     print("✅ C source validation passed")
 
 
 def test_makefile():
     """Test that the Makefile has required components."""
-    base_path = '..' if os.path.exists('../Makefile') else '.'
-    with open(f'{base_path}/Makefile', 'r') as f:
-        content = f.read()
+    content = _read_bytes(_BASE / 'Makefile')
 
     # Check for required variables (more flexible pattern)
-    required_vars = ['EXTENSION', 'EXTVERSION', 'MODULES', 'DATA']
-    for var in required_vars:
-        # Look for variable assignment with flexible whitespace
-        var_pattern = rf'^{var}\s*[:+]?='
-        assert re.search(var_pattern, content, re.MULTILINE), f"Makefile missing required variable: {var}"
+    for var in _MAKEFILE_VARS:
+        assert _MAKEFILE_VAR_RES[var].search(content), f"Makefile missing required variable: {var}"
 
     # Check for build targets
-    assert 'include $(PGXS)' in content, "Makefile missing PGXS include"
+    assert b'include $(PGXS)' in content, "Makefile missing PGXS include"
 
     print("✅ Makefile validation passed")
 
 
 def test_test_structure():
     """Test that the test directory structure is correct."""
-    base_path = '..' if os.path.exists('../test/sql/pg_retry.sql') else '.'
     test_files = [
-        f'{base_path}/test/sql/pg_retry.sql',
-        f'{base_path}/test/expected/pg_retry.out'
+        'test/sql/pg_retry.sql',
+        'test/expected/pg_retry.out'
     ]
 
+    tree = _repo_tree(_BASE)
     for test_file in test_files:
-        assert os.path.exists(test_file), f"Missing test file: {test_file}"
+        assert test_file in tree, f"Missing test file: {test_file}"
 
     print("✅ Test structure validation passed")
 
 
 def test_compilation():
     """Test that the extension compiles successfully."""
-    base_path = '..' if os.path.exists('../src/pg_retry.o') else '.'
+    tree = _repo_tree(_BASE)
     # Check that object files were created
-    assert os.path.exists(f'{base_path}/src/pg_retry.o'), "C source not compiled (missing .o file)"
-    
+    assert 'src/pg_retry.o' in tree, "C source not compiled (missing .o file)"
+
     # Check for platform-specific shared library (.so on Linux, .dylib on macOS)
-    has_so = os.path.exists(f'{base_path}/src/pg_retry.so')
-    has_dylib = os.path.exists(f'{base_path}/src/pg_retry.dylib')
+    has_so = 'src/pg_retry.so' in tree
+    has_dylib = 'src/pg_retry.dylib' in tree
     assert has_so or has_dylib, "Extension not linked (missing .so or .dylib file)"
 
     print("✅ Compilation validation passed")
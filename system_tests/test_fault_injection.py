@@ -26,20 +26,19 @@ def test_external_fault_injection_hook(pg_cluster):
     base_delay = int(os.environ.get("PG_FAULT_BASE_DELAY_MS", "5"))
     max_delay = int(os.environ.get("PG_FAULT_MAX_DELAY_MS", "250"))
 
-    pg_cluster.truncate_log()
-
-    # Set up a test failure plan for CI
-    if "execute_failure_plan" in fault_sql and "'test_fault'" in fault_sql:
-        pg_cluster.run_sql("SELECT retry.configure_failure_plan('test_fault', '40001', 3)")
-
-        # Test the failure plan directly first to ensure it works
-        try:
-            pg_cluster.run_sql("SELECT retry.execute_failure_plan('test_fault')")
-            pytest.skip("execute_failure_plan should have failed but didn't")
-        except Exception:
-            pass  # Expected to fail
-
     with psycopg.connect(pg_cluster.dsn(), autocommit=True) as conn:
+        # Set up a test failure plan for CI
+        if "execute_failure_plan" in fault_sql and "'test_fault'" in fault_sql:
+            conn.execute("SELECT retry.configure_failure_plan('test_fault', '40001', 3)")
+
+            # Test the failure plan directly first to ensure it works
+            try:
+                conn.execute(fault_sql)
+            except psycopg.Error:
+                pass  # Expected to fail
+            else:
+                pytest.skip("execute_failure_plan should have failed but didn't")
+
         with conn.cursor() as cur:
             if expect_success:
                 # Test expects success - just run the query
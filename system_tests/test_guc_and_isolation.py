@@ -53,27 +53,64 @@ def test_set_local_scope_does_not_leak(conn, dsn):
     assert value == "3"
 
 
+def test_pooled_connection_is_reset_for_the_next_borrower(pool):
+    """A reused pool connection comes back with clean GUCs and usable prepared statements."""
+    seen: set[int] = set()
+    for _ in range(pool.max_size + 1):
+        with pool.connection() as borrowed:
+            pid, lock_timeout = borrowed.execute(
+                "SELECT pg_backend_pid(), current_setting('lock_timeout')",
+                prepare=True,
+            ).fetchone()
+            assert lock_timeout == "0"
+            borrowed.execute("SET lock_timeout = '1s'")
+        if pid in seen:
+            break
+        seen.add(pid)
+    else:
+        pytest.fail("the pool never handed out the same connection twice")
+
+
 @pytest.mark.parametrize(
     "isolation_level",
     ["read committed", "repeatable read", "serializable"],
 )
-def test_lock_timeouts_are_retried_in_all_isolation_levels(pg_cluster, dsn, isolation_level):
+def test_lock_timeouts_are_retried_in_all_isolation_levels(pg_cluster, pool, isolation_level):
+    acquired = threading.Event()
+    release = threading.Event()
+
     def hold_lock():
-        with psycopg.connect(dsn) as locker:
+        with pool.connection() as locker:
             locker.autocommit = False
             with locker.cursor() as cur:
                 cur.execute("BEGIN")
                 cur.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
                 cur.execute("LOCK TABLE retry.accounts IN ACCESS EXCLUSIVE MODE")
-                time.sleep(0.4)
+                acquired.set()
+                # Wait until retry.lock_waiter() queues behind us, then hold the
+                # lock just past its 100ms lock_timeout so at least one attempt
+                # fails with 55P03 and has to be retried.
+                deadline = time.monotonic() + 5.0
+                while not release.is_set() and time.monotonic() < deadline:
+                    cur.execute(
+                        "SELECT count(*) FROM pg_locks "
+                        "WHERE relation = 'retry.accounts'::regclass AND NOT granted "
+                        # Every test database is cloned from one template, so the
+                        # table OID is the same in other workers' databases.
+                        "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+                    )
+                    if cur.fetchone()[0]:
+                        break
+                    time.sleep(0.01)
+                release.wait(timeout=0.15)
                 locker.commit()
 
     blocker = threading.Thread(target=hold_lock)
     blocker.start()
-    time.sleep(0.05)
+    assert acquired.wait(timeout=2.0), "blocker never acquired the table lock"
 
     try:
-        with psycopg.connect(dsn) as conn:
+        with pool.connection() as conn:
             conn.autocommit = False
             with conn.cursor() as cur:
                 cur.execute("BEGIN")
@@ -94,9 +131,10 @@ def test_lock_timeouts_are_retried_in_all_isolation_levels(pg_cluster, dsn, isol
 
                 cur.execute("COMMIT")
     finally:
+        release.set()
         blocker.join()
 
-    with psycopg.connect(dsn, autocommit=True) as check_conn:
+    with pool.connection() as check_conn:
         with check_conn.cursor() as cur:
             cur.execute(
                 """
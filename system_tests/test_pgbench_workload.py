@@ -1,34 +1,60 @@
 from __future__ import annotations
 
+import re
+import subprocess
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from .utils import fetch_scalar
 
-pytestmark = pytest.mark.pgbench
+pytestmark = [
+    pytest.mark.pgbench,
+    pytest.mark.usefixtures("pgbench_bin", "log_statement_enabled"),
+]
 
+# Any retry-related message, matched in one pass over the log bytes
+_RETRY_RE = re.compile(rb"pg_retry|retry attempt|SQLSTATE")
 
-def _require_pgbench(cluster):
-    if not cluster.pgbench_available():
-        pytest.skip("pgbench binary not found in PATH or pg_config --bindir")
+
+def _communicate(proc: subprocess.Popen[str], timeout: float = 30) -> tuple[str | None, str | None]:
+    """Wait for ``proc`` to finish, killing it if it outlives ``timeout``."""
+    try:
+        return proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
 
 
 def test_pgbench_deadlock_scripts(pg_cluster):
-    _require_pgbench(pg_cluster)
-    pg_cluster.truncate_log()
+    pg_cluster.mark_log()
 
     script_dir = Path(__file__).parent / "sql" / "pgbench"
     pg_cluster.run_sql("SELECT retry.configure_failure_plan('pgbench_deadlock', '40P01', 32)")
 
-    proc_a = pg_cluster.pgbench_process(script_dir / "deadlock_ab.sql", clients=4, threads=2, duration=5)
-    proc_b = pg_cluster.pgbench_process(script_dir / "deadlock_ba.sql", clients=4, threads=2, duration=5)
+    # More clients over a shorter run: with only three hot account rows the
+    # contention, not the wall-clock, is what produces the retries.
+    # Only the exit status matters here; stderr is kept for failure messages.
+    proc_a = pg_cluster.pgbench_process(
+        script_dir / "deadlock_ab.sql", clients=8, threads=4, duration=2, stdout_sink=subprocess.DEVNULL
+    )
+    proc_b = pg_cluster.pgbench_process(
+        script_dir / "deadlock_ba.sql", clients=8, threads=4, duration=2, stdout_sink=subprocess.DEVNULL
+    )
 
-    out_a, err_a = proc_a.communicate()
-    out_b, err_b = proc_b.communicate()
+    # Drain both stderr pipes at once so neither pgbench stalls on a full pipe
+    # while we wait for the other one.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        future_a = pool.submit(_communicate, proc_a)
+        future_b = pool.submit(_communicate, proc_b)
+        _, err_a = future_a.result()
+        _, err_b = future_b.result()
 
-    assert proc_a.returncode == 0, f"pgbench A failed: {err_a}\n{out_a}"
-    assert proc_b.returncode == 0, f"pgbench B failed: {err_b}\n{out_b}"
+    assert proc_a.returncode == 0, f"pgbench A failed: {err_a}"
+    assert proc_b.returncode == 0, f"pgbench B failed: {err_b}"
 
     history_count = fetch_scalar(
         pg_cluster.dsn(),
@@ -36,54 +62,33 @@ def test_pgbench_deadlock_scripts(pg_cluster):
     )
     assert history_count >= 20
 
-    log_excerpt = pg_cluster.read_log()
-    # Debug: print log content to see what's there
-    print(f"DEBUG: Log excerpt length: {len(log_excerpt)}")
-    if len(log_excerpt) > 0:
-        print(f"DEBUG: Log excerpt (first 500 chars): {log_excerpt[:500]}")
-    else:
-        print("DEBUG: Log excerpt is empty")
-
     # Be more lenient - check if any retry-related messages are in the log
-    retry_messages = ["pg_retry", "retry attempt", "SQLSTATE"]
-    found_retry = any(msg in log_excerpt for msg in retry_messages)
-    if not found_retry:
-        print("WARNING: No retry-related messages found in log, but continuing test")
+    if not pg_cluster.log_search(_RETRY_RE):
+        warnings.warn(f"No retry-related messages in the server log after {history_count} transfers")
         # Don't fail the test if no logs are found - the important part is that transfers happened
         assert history_count >= 20, f"Expected at least 20 transfers, got {history_count}"
         return
 
-    assert "SQLSTATE 40P01" in log_excerpt
+    assert pg_cluster.log_contains([b"SQLSTATE 40P01"]), "Expected SQLSTATE 40P01 in the server log"
 
 
 def test_pgbench_lock_timeout_load(pg_cluster):
-    _require_pgbench(pg_cluster)
-    pg_cluster.truncate_log()
+    pg_cluster.mark_log()
 
     script = Path(__file__).parent / "sql" / "pgbench" / "lock_timeout.sql"
     pg_cluster.run_sql("SELECT retry.configure_failure_plan('pgbench_lock', '55P03', 12)")
 
-    result = pg_cluster.pgbench_run(script, clients=6, threads=3, duration=6)
+    result = pg_cluster.pgbench_run(script, clients=8, threads=4, duration=2)
     assert "processed" in result.stdout
 
     total_balance = fetch_scalar(pg_cluster.dsn(), "SELECT sum(balance) FROM retry.accounts")
     assert total_balance == 3000
 
-    log_excerpt = pg_cluster.read_log()
-    # Debug: print log content to see what's there
-    print(f"DEBUG: Log excerpt length: {len(log_excerpt)}")
-    if len(log_excerpt) > 0:
-        print(f"DEBUG: Log excerpt (first 500 chars): {log_excerpt[:500]}")
-    else:
-        print("DEBUG: Log excerpt is empty")
-
     # Be more lenient - check if any retry-related messages are in the log
-    retry_messages = ["pg_retry", "retry attempt", "SQLSTATE"]
-    found_retry = any(msg in log_excerpt for msg in retry_messages)
-    if not found_retry:
-        print("WARNING: No retry-related messages found in log, but continuing test")
+    if not pg_cluster.log_search(_RETRY_RE):
+        warnings.warn(f"No retry-related messages in the server log; pgbench output:\n{result.stdout}")
         # Don't fail the test if no logs are found - the important part is that the workload ran
         assert "processed" in result.stdout, f"pgbench didn't process transactions: {result.stdout}"
         return
 
-    assert "SQLSTATE 55P03" in log_excerpt
+    assert pg_cluster.log_contains([b"SQLSTATE 55P03"]), "Expected SQLSTATE 55P03 in the server log"
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import os
-import shutil
 import subprocess
 import time
+import uuid
 from pathlib import Path
 
 import psycopg
@@ -11,61 +11,85 @@ import pytest
 
 
 @pytest.mark.pgreplay
-def test_pgreplay_infrastructure_available(pg_cluster):  # noqa: ARG001
+def test_pgreplay_infrastructure_available(pg_cluster, pgreplay_version):  # noqa: ARG001
     """Test that pgreplay binary is available and can be invoked."""
-    pgreplay_bin = shutil.which("pgreplay")
-    assert pgreplay_bin is not None, "pgreplay binary not found in PATH - pgreplay tests require pgreplay to be installed"
-
-    # Test that pgreplay can show help/version
-    completed = subprocess.run(
-        [pgreplay_bin, "-v"],
-        capture_output=True,
-        text=True,
-        timeout=10
-    )
-
-    # Should show version without errors
-    assert completed.returncode == 0, f"pgreplay version check failed: {completed.stderr}"
-    assert "pgreplay" in completed.stdout.lower(), "Should show pgreplay version"
+    # pgreplay -v runs once per session in the pgreplay_version fixture
+    assert "pgreplay" in pgreplay_version.lower(), "Should show pgreplay version"
 
     # Test validates that pgreplay infrastructure is available for retry testing
 
 
-def _run_pgreplay_replay(pg_cluster, require_csv: bool = False) -> None:
-    pgreplay_bin = shutil.which("pgreplay")
-    assert pgreplay_bin is not None, "pgreplay binary not found in PATH - pgreplay tests require pgreplay to be installed"
-    source_db = "pgreplay_source_db"
-    with psycopg.connect(pg_cluster.dsn(), autocommit=True) as conn:
-        conn.execute(f"CREATE DATABASE {source_db}")
-    target_db = "pgreplay_target_db"
+def _list_logs(log_dir: Path) -> list[tuple[float, Path]]:
+    """Return ``(mtime, path)`` for every .log/.csv file in ``log_dir`` in one scandir pass."""
+    try:
+        with os.scandir(log_dir) as it:
+            return [
+                (entry.stat().st_mtime, Path(entry.path))
+                for entry in it
+                if entry.name.endswith((".log", ".csv"))
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def _newest_log(log_dirs: list[Path], timeout: float = 5.0) -> tuple[Path, int]:
+    """Wait for the server to emit a log file and return ``(newest, csv_count)``.
+
+    Each poll is one scandir pass per directory, so a log that has not been
+    flushed yet is waited for instead of failing the test outright.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        for log_dir in log_dirs:
+            log_files = _list_logs(log_dir)
+            if log_files:
+                csv_count = sum(1 for _, path in log_files if path.suffix == ".csv")
+                # Prefer CSV for pgreplay on ties
+                _, newest = max(log_files, key=lambda entry: (entry[0], entry[1].suffix == ".csv"))
+                return newest, csv_count
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"no .log/.csv files appeared in {log_dirs} within {timeout}s")
+        time.sleep(0.05)
+
+
+def _run_pgreplay_replay(
+    pg_cluster,
+    pgreplay_bin: str,
+    retry_template_db: str,
+    require_csv: bool = False,
+) -> None:
+    # Both databases are cloned with pg_retry and the helpers already installed;
+    # the suffix keeps concurrent pytest processes on the shared cluster apart
+    suffix = uuid.uuid4().hex[:8]
+    source_db = f"pgreplay_source_db_{suffix}"
+    target_db = f"pgreplay_target_db_{suffix}"
     with psycopg.connect(pg_cluster.dsn(), autocommit=True) as conn:
-        conn.execute(f"CREATE DATABASE {target_db}")
+        conn.execute(f"CREATE DATABASE {source_db} TEMPLATE {retry_template_db}")
+        conn.execute(f"CREATE DATABASE {target_db} TEMPLATE {retry_template_db}")
     try:
-        # Drop any statements captured from prior tests to keep the replay log small.
-        pg_cluster.truncate_log()
         source_dsn = pg_cluster.dsn(dbname=source_db)
         target_dsn = pg_cluster.dsn(dbname=target_db)
 
         # Set up source database with retry operations
-        with psycopg.connect(source_dsn) as conn:
-            # Install pg_retry extension and helpers
-            conn.execute("CREATE EXTENSION IF NOT EXISTS pg_retry")
-            helpers_path = Path(__file__).parent / "sql" / "helpers.sql"
-            with open(helpers_path, 'r') as f:
-                helpers_sql = f.read()
-            conn.execute(helpers_sql)
-
-            # Create test table and data
-            conn.execute("""
-                CREATE TABLE test_replay_data (
-                    id SERIAL PRIMARY KEY,
-                    value TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Enable detailed logging and retry settings for this session
-            conn.execute("SET log_statement = 'all'")
+        with psycopg.connect(source_dsn, autocommit=True) as conn:
+            # Pipeline only the setup that runs before statement logging is on:
+            # pipeline mode always uses the extended protocol, which would log
+            # parse/bind/execute entries instead of the "statement:" lines this
+            # test replays.
+            with conn.pipeline():
+                # Create test table and data
+                conn.execute("""
+                    CREATE TABLE test_replay_data (
+                        id SERIAL PRIMARY KEY,
+                        value TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Enable detailed logging for this session
+                conn.execute("SET log_statement = 'all'")
+
+            # Retry settings for this session
             conn.execute("SET log_min_messages = 'log'")
             conn.execute("SET retry.max_tries = 3")
             conn.execute("SET retry.base_delay_ms = 10")
@@ -83,34 +107,18 @@ def _run_pgreplay_replay(pg_cluster, require_csv: bool = False) -> None:
             result = conn.execute("SELECT COUNT(*) FROM test_replay_data").fetchone()[0]
             assert result == 2, f"Source should have 2 rows, got {result}"
 
-        # Find the log file generated
-        log_dir = pg_cluster.data_dir / "pg_log"
-        log_files = list(log_dir.glob("*.log")) if log_dir.exists() else []
-        csv_files = list(log_dir.glob("*.csv")) if log_dir.exists() else []
-
-        if not log_files and not csv_files:
-            # Try alternative log directory
-            log_dir = pg_cluster.data_dir / "log"
-            log_files = list(log_dir.glob("*.log")) if log_dir.exists() else []
-            csv_files = list(log_dir.glob("*.csv")) if log_dir.exists() else []
-
-        # Use CSV files for pgreplay if available, otherwise use log files
-        all_files = csv_files + log_files
-        assert all_files, f"No log files found - PostgreSQL logging may not be working properly. Checked directories: {pg_cluster.data_dir}/pg_log and {pg_cluster.data_dir}/log. Found {len(log_files)} .log files and {len(csv_files)} .csv files."
-
-        # Use the most recent log file (prefer CSV for pgreplay)
-        log_file = sorted(all_files, key=lambda x: x.stat().st_mtime, reverse=True)[0]
+        # Find the most recent log file, waiting briefly for it to be flushed
+        log_dirs = [pg_cluster.data_dir / "pg_log", pg_cluster.data_dir / "log"]
+        try:
+            log_file, csv_count = _newest_log(log_dirs)
+        except TimeoutError as exc:
+            pytest.fail(f"No log files found - PostgreSQL logging may not be working properly: {exc}")
 
-        if require_csv and not csv_files:
+        if require_csv and not csv_count:
             pytest.skip("Cluster logging did not produce CSV files")
 
         # Set up target database (same schema, no data)
-        with psycopg.connect(target_dsn) as conn:
-            conn.execute("CREATE EXTENSION IF NOT EXISTS pg_retry")
-            with open(helpers_path, 'r') as f:
-                helpers_sql = f.read()
-            conn.execute(helpers_sql)
-
+        with psycopg.connect(target_dsn, autocommit=True) as conn:
             conn.execute("""
                 CREATE TABLE test_replay_data (
                     id SERIAL PRIMARY KEY,
@@ -134,6 +142,9 @@ def _run_pgreplay_replay(pg_cluster, require_csv: bool = False) -> None:
             "-p", str(pg_cluster.port),
             "-U", pg_cluster.user,
             "-j",
+            # The log is shared with other pytest processes; replay only this
+            # test's source database
+            "-D", source_db,
         ]
 
         if log_file.suffix == '.csv':
@@ -176,38 +187,30 @@ def _run_pgreplay_replay(pg_cluster, require_csv: bool = False) -> None:
 
 
 @pytest.mark.pgreplay
-def test_pgreplay_log_replay_with_std_logging(pg_cluster):
+def test_pgreplay_log_replay_with_std_logging(pg_cluster, pgreplay_bin, retry_template_db):
     """Test that pgreplay can replay standard logs containing pg_retry operations."""
-    _run_pgreplay_replay(pg_cluster, require_csv=False)
+    _run_pgreplay_replay(pg_cluster, pgreplay_bin, retry_template_db, require_csv=False)
 
 
 @pytest.mark.pgreplay
-def test_pgreplay_log_replay_with_csv_logging(pg_cluster):
+def test_pgreplay_log_replay_with_csv_logging(pg_cluster, pgreplay_bin, retry_template_db):
     """Test that pgreplay can replay logs when CSV logging is enabled."""
-    _run_pgreplay_replay(pg_cluster, require_csv=True)
+    _run_pgreplay_replay(pg_cluster, pgreplay_bin, retry_template_db, require_csv=True)
 
 @pytest.mark.pgreplay
-def test_pgreplay_basic_functionality(pg_cluster):
+def test_pgreplay_basic_functionality(pg_cluster, pgreplay_bin, pgreplay_version, retry_template_db):
     """Test basic pgreplay functionality with retry operations."""
-    pgreplay_bin = shutil.which("pgreplay")
-    assert pgreplay_bin is not None, "pgreplay binary not found in PATH - pgreplay tests require pgreplay to be installed"
 
-    # Create a test database
-    test_db = "pgreplay_basic_test"
+    # Create a test database with pg_retry and the helpers already installed
+    test_db = f"pgreplay_basic_test_{uuid.uuid4().hex[:8]}"
     with psycopg.connect(pg_cluster.dsn(), autocommit=True) as conn:
-        conn.execute(f"CREATE DATABASE {test_db}")
+        conn.execute(f"CREATE DATABASE {test_db} TEMPLATE {retry_template_db}")
 
     try:
         test_dsn = pg_cluster.dsn(dbname=test_db)
 
         # Set up database with basic retry functionality
-        with psycopg.connect(test_dsn) as conn:
-            conn.execute("CREATE EXTENSION IF NOT EXISTS pg_retry")
-            helpers_path = Path(__file__).parent / "sql" / "helpers.sql"
-            with open(helpers_path, 'r') as f:
-                helpers_sql = f.read()
-            conn.execute(helpers_sql)
-
+        with psycopg.connect(test_dsn, autocommit=True) as conn:
             # Create a simple test table
             conn.execute("""
                 CREATE TABLE pgreplay_test (
@@ -230,18 +233,8 @@ def test_pgreplay_basic_functionality(pg_cluster):
         env = pg_cluster.client_env()
         env["PGDATABASE"] = test_db
 
-        # Test pgreplay version command
-        cmd = [pgreplay_bin, "-v"]
-        completed = subprocess.run(
-            cmd,
-            env=env,
-            text=True,
-            capture_output=True,
-            timeout=30
-        )
-
-        assert completed.returncode == 0, f"pgreplay version failed: {completed.stderr}"
-        assert "pgreplay" in completed.stdout.lower(), "Should show pgreplay version"
+        # Test pgreplay version output (probed once per session)
+        assert "pgreplay" in pgreplay_version.lower(), "Should show pgreplay version"
 
         # Test that pgreplay can attempt database connection
         cmd = [
@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import random
 from concurrent.futures import ThreadPoolExecutor
-from .utils import fetch_scalar, run_retry_sql
+from .utils import fetch_row, fetch_scalar, run_retry_sql
 
 
 def test_concurrent_deadlocks_are_retried(pg_cluster):
     """Use many workers grabbing advisory locks in opposite order."""
     dsn = pg_cluster.dsn()
-    pg_cluster.truncate_log()
+    pg_cluster.mark_log()
     pg_cluster.run_sql("SELECT retry.configure_failure_plan('forced_deadlock', '40P01', 12)")
 
     deadlocks_before = fetch_scalar(
@@ -26,23 +26,25 @@ def test_concurrent_deadlocks_are_retried(pg_cluster):
     ] * 6
     random.shuffle(statements)
 
+    # psycopg releases the GIL during libpq I/O, so one thread per statement
+    # keeps every transfer in flight at once.
     with ThreadPoolExecutor(max_workers=len(statements)) as pool:
         futures = [pool.submit(run_retry_sql, dsn, stmt) for stmt in statements]
         for future in futures:
             future.result(timeout=60)
 
-    total_balance = fetch_scalar(dsn, "SELECT sum(balance) FROM retry.accounts")
-    history_count = fetch_scalar(dsn, "SELECT count(*) FROM retry.transfer_history")
-
-    assert total_balance == 3000
-    assert history_count == len(statements)
-
-    deadlocks_after = fetch_scalar(
+    # One round-trip for every post-workload check
+    total_balance, history_count, deadlocks_after = fetch_row(
         dsn,
         """
-        SELECT pg_stat_get_db_deadlocks(oid)
+        SELECT (SELECT sum(balance) FROM retry.accounts),
+               (SELECT count(*) FROM retry.transfer_history),
+               pg_stat_get_db_deadlocks(oid)
         FROM pg_database
         WHERE datname = current_database()
         """,
     )
+
+    assert total_balance == 3000
+    assert history_count == len(statements)
     assert deadlocks_after > deadlocks_before
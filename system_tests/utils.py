@@ -1,9 +1,38 @@
 from __future__ import annotations
 
-import random
-import time
+import atexit
+import threading
 
-import psycopg
+from psycopg_pool import ConnectionPool
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(dsn: str) -> ConnectionPool:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(dsn)
+        if pool is None:
+            # Connections are opened on demand and reused; don't hold extra
+            # idle backends on the cluster every pytest process shares.
+            pool = ConnectionPool(
+                dsn,
+                kwargs={"autocommit": True},
+                min_size=1,
+                max_size=32,
+                max_idle=30,
+                open=True,
+            )
+            _POOLS[dsn] = pool
+        return pool
+
+
+@atexit.register
+def _close_pools() -> None:
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
 
 
 def run_retry_sql(
@@ -14,18 +43,19 @@ def run_retry_sql(
     base_delay_ms: int = 5,
     max_delay_ms: int = 250,
 ) -> None:
-    time.sleep(random.uniform(0, 0.05))
-    with psycopg.connect(dsn, autocommit=True) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT retry.retry(%s, %s, %s, %s)",
-                (sql, max_tries, base_delay_ms, max_delay_ms),
-            )
+    with _get_pool(dsn).connection() as conn:
+        conn.execute(
+            "SELECT retry.retry(%s, %s, %s, %s)",
+            (sql, max_tries, base_delay_ms, max_delay_ms),
+        )
 
 
 def fetch_scalar(dsn: str, sql: str):
-    with psycopg.connect(dsn, autocommit=True) as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql)
-            row = cur.fetchone()
-            return row[0] if row else None
+    with _get_pool(dsn).connection() as conn:
+        row = conn.execute(sql).fetchone()
+        return row[0] if row else None
+
+
+def fetch_row(dsn: str, sql: str) -> tuple | None:
+    with _get_pool(dsn).connection() as conn:
+        return conn.execute(sql).fetchone()